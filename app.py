@@ -1,10 +1,12 @@
 import streamlit as st
 import os
-from docx import Document
+import sys
 import re
+import json
+import functools
 import urllib.parse
 import base64
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 
 # Set page config
 st.set_page_config(
@@ -15,110 +17,242 @@ st.set_page_config(
 
 TEMPLATE_FOLDER = "Templates"
 
-def read_docx(file_path):
-    """Read Word document and return full text"""
+# Compiled once at import time; matches {PlaceholderName} tokens
+_PLACEHOLDER_RE = re.compile(r'\{([^}]+)\}')
+
+# Matches a leading "Subject: ..." line followed by the body
+_SUBJECT_RE = re.compile(r'(?is)\s*subject:[ \t]*(.*?)(?:\r?\n(.*))?$')
+
+# Paragraph breaks vs single line breaks, replaced in one pass
+_NL_RE = re.compile(r'\n\n|\n')
+
+# Per-template feature flags, keyed by filename stem. O(1) lookup instead of
+# substring checks against the selected template name.
+_TEMPLATE_FEATURES = {
+    'Online_Interview': {'calendar': True},
+}
+
+# Static button markup, built once at import time; only the URL varies per rerun
+_EMAIL_BTN_TMPL = """
+<a href="{url}" target="_blank" style="text-decoration: none;">
+    <button style="
+        background-color: #0078D4;
+        color: white;
+        padding: 12px 24px;
+        font-size: 16px;
+        font-weight: bold;
+        border: none;
+        border-radius: 4px;
+        cursor: pointer;
+        width: 100%;
+        margin-bottom: 10px;
+    ">
+        📧 Open Email in Outlook
+    </button>
+</a>
+"""
+
+_CALENDAR_BTN_TMPL = """
+<a href="{url}" target="_blank" style="text-decoration: none;">
+    <button style="
+        background-color: #28A745;
+        color: white;
+        padding: 12px 24px;
+        font-size: 16px;
+        font-weight: bold;
+        border: none;
+        border-radius: 4px;
+        cursor: pointer;
+        width: 100%;
+        margin-bottom: 10px;
+    ">
+        📅 Create Calendar Meeting
+    </button>
+</a>
+"""
+
+_CALENDAR_BTN_DISABLED = """
+<button style="
+    background-color: #CCCCCC;
+    color: #666666;
+    padding: 12px 24px;
+    font-size: 16px;
+    font-weight: bold;
+    border: none;
+    border-radius: 4px;
+    cursor: not-allowed;
+    width: 100%;
+    margin-bottom: 10px;
+" disabled>
+    📅 Create Calendar Meeting
+</button>
+"""
+
+@st.cache_data(ttl=30)
+def list_templates(folder):
+    """Map template filename -> mtime_ns (cached briefly to skip per-rerun scans)
+
+    os.scandir exposes name and stat from a single directory scan, so the
+    mtimes used as read_docx cache keys come for free with the listing.
+    """
+    with os.scandir(folder) as entries:
+        templates = [e for e in entries
+                     if e.is_file() and e.name.endswith('.docx') and not e.name.startswith('~$')]
+    return {e.name: e.stat().st_mtime_ns for e in sorted(templates, key=lambda e: e.name)}
+
+@st.cache_data
+def read_docx(file_path, mtime):
+    """Read Word document and return full text.
+
+    Cached per (path, mtime) so the docx is only re-parsed when the
+    template file actually changes, not on every Streamlit rerun.
+    """
+    # Imported lazily: pulling in python-docx (and lxml) is expensive and
+    # unnecessary when the app stops early, e.g. with no templates present
+    from docx import Document
+
     try:
         doc = Document(file_path)
-        full_text = []
-        for para in doc.paragraphs:
-            if para.text.strip():  # Only add non-empty paragraphs
-                full_text.append(para.text)
-        return "\n".join(full_text)
+        # Only keep non-empty paragraphs
+        return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
     except Exception as e:
         st.error(f"Error reading document: {e}")
         return None
 
+@st.cache_data
 def extract_subject_and_body(content):
     """Extract subject line and body from content"""
-    lines = content.split('\n')
-    subject = ""
-    body_lines = []
-    
-    subject_found = False
-    for line in lines:
-        if line.strip().lower().startswith('subject:'):
-            subject = line.split(':', 1)[1].strip()
-            subject_found = True
-        elif subject_found:
-            body_lines.append(line)
-        else:
-            body_lines.append(line)
-    
-    body = '\n'.join(body_lines).strip()
-    return subject, body
+    match = _SUBJECT_RE.match(content)
+    if match:
+        body = match.group(2) or ""
+        return match.group(1).strip(), body.strip()
+    return "", content.strip()
 
+@st.cache_data
 def extract_placeholders(text):
     """Extract unique placeholders in {PlaceholderName} format"""
-    placeholders = re.findall(r'\{([^}]+)\}', text)
+    placeholders = _PLACEHOLDER_RE.findall(text)
     # Preserve order but remove duplicates
     seen = set()
     unique_placeholders = []
     for ph in placeholders:
         if ph not in seen:
             seen.add(ph)
-            unique_placeholders.append(ph)
+            # Interned: these strings are reused as widget keys and dict keys
+            # on every rerun, so lookups compare by identity
+            unique_placeholders.append(sys.intern(ph))
     return unique_placeholders
 
-def replace_placeholders(text, values):
-    """Replace placeholders with values"""
-    result = text
-    for placeholder, value in values.items():
-        result = result.replace(f"{{{placeholder}}}", value)
-    return result
+@st.cache_data
+def load_template(doc_path, mtime_ns):
+    """Load (content, subject, body, placeholders) for a template.
+
+    Cached in memory per (path, mtime_ns) so reruns never touch the disk.
+    A sidecar <name>.docx.parsed.json caches the parsed form on disk, so
+    fresh processes and cloud cold starts skip python-docx/lxml entirely.
+    The sidecar is rebuilt whenever the .docx is newer.
+    """
+    sidecar = doc_path + '.parsed.json'
+    try:
+        if os.stat(sidecar).st_mtime_ns >= mtime_ns:
+            with open(sidecar, encoding='utf-8') as f:
+                parsed = json.load(f)
+            return (parsed['content'], parsed['subject'], parsed['body'],
+                    [sys.intern(ph) for ph in parsed['placeholders']])
+    except (OSError, ValueError, KeyError):
+        pass  # Missing or stale/corrupt sidecar: fall through and re-parse
+
+    content = read_docx(doc_path, mtime_ns)
+    if content is None:
+        return None, "", "", []
+    subject, body = extract_subject_and_body(content)
+    placeholders = extract_placeholders(content)
+    try:
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump({'content': content, 'subject': subject, 'body': body,
+                       'placeholders': placeholders}, f)
+    except OSError:
+        pass  # Read-only deployments still work, just without the disk cache
+    return content, subject, body, placeholders
+
+@functools.lru_cache(maxsize=64)
+def _placeholder_pattern(keys):
+    """Compiled alternation matching exactly the given {key} tokens, cached
+    per unique placeholder set (one per template in practice)"""
+    return re.compile('|'.join(re.escape('{' + k + '}') for k in keys))
 
+def replace_placeholders(text, values):
+    """Replace placeholders with values in a single pass over the text"""
+    # Nothing typed yet (or nothing to do): leave the template untouched
+    if not values or not any(values.values()):
+        return text
+    if '{' not in text:
+        return text
+    pattern = _placeholder_pattern(tuple(values))
+    # Empty values keep their placeholder visible instead of blanking it
+    return pattern.sub(lambda m: values.get(m.group(0)[1:-1]) or m.group(0), text)
+
+@st.cache_data(max_entries=32)
+def _encode_body(body):
+    """Percent-encode the email body, cached per unique body
+
+    The body is by far the largest component of the deep link; caching it
+    separately means editing a recipient field doesn't re-encode the body.
+    """
+    # Single-line bodies skip the line-break rewrite entirely
+    if '\n' not in body:
+        return urllib.parse.quote(body, safe='')
+    # Outlook Web deep link only supports plain text; use CRLF line breaks
+    # so they survive percent-encoding as %0D%0A
+    return urllib.parse.quote(body.replace('\n', '\r\n'), safe='')
+
+@st.cache_data(max_entries=32)
 def create_outlook_web_link(subject, body, to="", cc="", bcc=""):
-    """Create Outlook Web deep link"""
-    # Outlook Web deep link only supports plain text
-    # Use proper line break encoding for URLs
-    body_encoded = body.replace('\n', '%0D%0A')
-    
-    # Build the Outlook Web compose URL
-    params = {
-        'subject': urllib.parse.quote(subject),
-        'body': body_encoded
-    }
-    
+    """Create Outlook Web deep link (memoized per unique arguments)"""
+    params = {'subject': subject}
+
     if to:
-        params['to'] = urllib.parse.quote(to)
+        params['to'] = to
     if cc:
-        params['cc'] = urllib.parse.quote(cc)
+        params['cc'] = cc
     if bcc:
-        params['bcc'] = urllib.parse.quote(bcc)
-    
-    # Build query string
-    query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-    
-    outlook_url = f"https://outlook.office.com/mail/deeplink/compose?{query_string}"
-    
+        params['bcc'] = bcc
+
+    # Encode the small fields in one pass; the body is cached separately
+    query_string = urllib.parse.urlencode(params, quote_via=urllib.parse.quote)
+
+    outlook_url = f"https://outlook.office.com/mail/deeplink/compose?{query_string}&body={_encode_body(body)}"
+
     return outlook_url
 
+@st.cache_data(max_entries=32)
 def create_calendar_meeting_link(subject, body, attendees, start_time, end_time, location=""):
-    """Create Outlook Calendar deep link for meeting"""
+    """Create Outlook Calendar deep link for meeting (memoized per unique arguments)"""
     # Format times for Outlook Calendar (ISO 8601 format)
     start_iso = start_time.strftime('%Y-%m-%dT%H:%M:%S')
     end_iso = end_time.strftime('%Y-%m-%dT%H:%M:%S')
     
-    # Convert body to HTML with proper formatting
-    html_body = body.replace('\n\n', '</p><p>').replace('\n', '<br>')
+    # Convert body to HTML with proper formatting (single pass)
+    html_body = _NL_RE.sub(lambda m: '</p><p>' if len(m.group(0)) == 2 else '<br>', body)
     html_body = f'<p>{html_body}</p>'
     
     # Build the Outlook Calendar compose URL
     params = {
-        'subject': urllib.parse.quote(subject),
-        'body': urllib.parse.quote(html_body),
-        'startdt': urllib.parse.quote(start_iso),
-        'enddt': urllib.parse.quote(end_iso),
+        'subject': subject,
+        'body': html_body,
+        'startdt': start_iso,
+        'enddt': end_iso,
         'path': '/calendar/action/compose'
     }
-    
+
     if attendees:
-        params['to'] = urllib.parse.quote(attendees)
-    
+        params['to'] = attendees
+
     if location:
-        params['location'] = urllib.parse.quote(location)
-    
-    # Build query string
-    query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
+        params['location'] = location
+
+    # Encode everything in one pass
+    query_string = urllib.parse.urlencode(params, quote_via=urllib.parse.quote)
     
     calendar_url = f"https://outlook.office.com/calendar/0/deeplink/compose?{query_string}"
     
@@ -135,7 +269,8 @@ if not os.path.exists(TEMPLATE_FOLDER):
     st.stop()
 
 # Load templates
-template_files = [f for f in os.listdir(TEMPLATE_FOLDER) if f.endswith('.docx') and not f.startswith('~$')]
+template_mtimes = list_templates(TEMPLATE_FOLDER)
+template_files = list(template_mtimes)
 
 if not template_files:
     st.error("❌ No .docx templates found in the 'Templates' folder.")
@@ -149,22 +284,19 @@ template_name = st.selectbox(
     format_func=lambda x: x.replace('.docx', '').replace('_', ' ')
 )
 
-# Check if this is the Online Interview template
-is_interview_template = 'Online_Interview' in template_name
+# Check if this template needs the calendar-meeting workflow
+template_features = _TEMPLATE_FEATURES.get(template_name.removesuffix('.docx'), {})
+is_interview_template = template_features.get('calendar', False)
 
 # Load selected template
 doc_path = os.path.join(TEMPLATE_FOLDER, template_name)
-content = read_docx(doc_path)
+content, subject_text, body_text, placeholders = load_template(
+    doc_path, template_mtimes[template_name]
+)
 
 if content is None:
     st.stop()
 
-# Extract subject and body
-subject_text, body_text = extract_subject_and_body(content)
-
-# Find all placeholders
-placeholders = extract_placeholders(content)
-
 # Show template preview
 with st.expander("📄 View Template", expanded=False):
     st.text(content)
@@ -173,19 +305,24 @@ with st.expander("📄 View Template", expanded=False):
 if placeholders:
     st.subheader("2️⃣ Fill in Details")
     values = {}
-    
-    # Create columns for better layout
-    col1, col2 = st.columns(2)
-    
-    for idx, placeholder in enumerate(placeholders):
-        # Alternate between columns
-        with col1 if idx % 2 == 0 else col2:
-            values[placeholder] = st.text_input(
-                placeholder.replace('_', ' ').title(),
-                key=placeholder,
-                placeholder=f"Enter {placeholder.lower()}"
-            )
-    
+
+    # Batch the inputs in a form so typing doesn't rerun the whole script
+    # per keystroke — the preview and links update once on submit
+    with st.form("placeholder_form"):
+        # Create columns for better layout
+        col1, col2 = st.columns(2)
+
+        for idx, placeholder in enumerate(placeholders):
+            # Alternate between columns
+            with col1 if idx % 2 == 0 else col2:
+                values[placeholder] = st.text_input(
+                    placeholder.replace('_', ' ').title(),
+                    key=placeholder,
+                    placeholder=f"Enter {placeholder.lower()}"
+                )
+
+        st.form_submit_button("Update Preview")
+
     # Replace placeholders
     final_subject = replace_placeholders(subject_text, values)
     final_body = replace_placeholders(body_text, values)
@@ -208,14 +345,18 @@ if is_interview_template:
     col1, col2 = st.columns(2)
     
     with col1:
+        # Default date is fixed once per session so it doesn't drift per rerun
+        default_date = st.session_state.setdefault(
+            'default_interview_date', (datetime.now() + timedelta(days=7)).date()
+        )
         meeting_date = st.date_input(
             "Interview Date",
-            value=datetime.now() + timedelta(days=7),
+            value=default_date,
             min_value=datetime.now().date()
         )
         meeting_start = st.time_input(
             "Start Time",
-            value=datetime.strptime("10:00", "%H:%M").time()
+            value=time(10, 0)
         )
     
     with col2:
@@ -299,24 +440,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Email button
-    st.markdown(f"""
-    <a href="{outlook_link}" target="_blank" style="text-decoration: none;">
-        <button style="
-            background-color: #0078D4;
-            color: white;
-            padding: 12px 24px;
-            font-size: 16px;
-            font-weight: bold;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            width: 100%;
-            margin-bottom: 10px;
-        ">
-            📧 Open Email in Outlook
-        </button>
-    </a>
-    """, unsafe_allow_html=True)
+    st.markdown(_EMAIL_BTN_TMPL.format(url=outlook_link), unsafe_allow_html=True)
 
 with col2:
     # Calendar button (only for interview template)
@@ -330,41 +454,9 @@ with col2:
             location=meeting_link if meeting_link else meeting_platform
         )
         
-        st.markdown(f"""
-        <a href="{calendar_link}" target="_blank" style="text-decoration: none;">
-            <button style="
-                background-color: #28A745;
-                color: white;
-                padding: 12px 24px;
-                font-size: 16px;
-                font-weight: bold;
-                border: none;
-                border-radius: 4px;
-                cursor: pointer;
-                width: 100%;
-                margin-bottom: 10px;
-            ">
-                📅 Create Calendar Meeting
-            </button>
-        </a>
-        """, unsafe_allow_html=True)
+        st.markdown(_CALENDAR_BTN_TMPL.format(url=calendar_link), unsafe_allow_html=True)
     elif is_interview_template:
-        st.markdown("""
-        <button style="
-            background-color: #CCCCCC;
-            color: #666666;
-            padding: 12px 24px;
-            font-size: 16px;
-            font-weight: bold;
-            border: none;
-            border-radius: 4px;
-            cursor: not-allowed;
-            width: 100%;
-            margin-bottom: 10px;
-        " disabled>
-            📅 Create Calendar Meeting
-        </button>
-        """, unsafe_allow_html=True)
+        st.markdown(_CALENDAR_BTN_DISABLED, unsafe_allow_html=True)
         st.caption("⚠️ Fill in meeting details and candidate email to enable")
 
 if is_interview_template: